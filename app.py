@@ -1,23 +1,54 @@
 import streamlit as st
-from classes import ExpenseManager, Expense
+from classes import ExpenseManager, Expense, DEFAULT_USER_ID, MAX_USER_ID_LENGTH
 from datetime import datetime
 from styles import load_css
 from charts import create_expense_pie_chart
-from utils import get_available_months, filter_expenses_by_period
+from utils import get_available_months, filter_expenses_by_period, sum_by_category
+from money import Money
 from validations import CATEGORIES
 
+# Upper limit for amount inputs (well inside Money's int64 cents range)
+MAX_AMOUNT = 1_000_000_000.0
+
 # Load custom CSS styles  
 load_css()
 
 # Page Setup
 st.title("💰 My Expense Tracker")
 
-# Ensure ExpenseManager persists across reruns.
-if 'manager' not in st.session_state:
-    st.session_state.manager = ExpenseManager()
+# Most users kept in memory at once (least recently used are dropped)
+MAX_CACHED_USERS = 100
+
+@st.cache_resource(max_entries=MAX_CACHED_USERS)
+def get_manager(user_id):
+    """
+    Returns the ExpenseManager for a user, shared by all sessions/tabs of that user
+    so each user's data is loaded (and synced) once per server process.
+    Only existing users (and the default user) are opened - a URL never creates a user.
+    """
+    return ExpenseManager(user_id, create_user=(user_id == DEFAULT_USER_ID))
+
+# Active user comes from the URL (e.g. ?user=alice), falling back to the default user.
+# NOTE: there is no authentication - anyone who can reach the app can open any user's data.
+user_id = st.query_params.get("user", DEFAULT_USER_ID)
+if not user_id or len(user_id) > MAX_USER_ID_LENGTH:
+    st.error(f"Invalid user: the user name must be 1-{MAX_USER_ID_LENGTH} characters.")
+    st.stop()
 
 # Create a local reference for easier access
-manager = st.session_state.manager
+try:
+    manager = get_manager(user_id)
+except ValueError:
+    # New users are created from the CLI: APP_USER_ID=<name> python main.py
+    st.error(f"Unknown user: {user_id}")
+    st.stop()
+
+# The manager lives as long as the server: pick up recurring expenses that came due since yesterday
+manager.materialize_if_due()
+
+# Database down: the manager serves its local snapshot and rejects changes
+if manager.read_only:
+    st.warning("⚠️ Offline - showing your last saved data. Changes are disabled until the database is back.")
 
 # Sidebar: Add New Expense
 st.sidebar.header("Add New Expense")
@@ -30,16 +61,18 @@ input_category = st.sidebar.selectbox("Category", CATEGORIES)
 
 # Logic for Adding Expense
 input_name = st.sidebar.text_input("Description")
-input_amount = st.sidebar.number_input("Amount", min_value=0.0, step=1.0)
+input_amount = st.sidebar.number_input("Amount", min_value=0.0, max_value=MAX_AMOUNT, step=1.0)
 
 if st.sidebar.button("Add Expense"):
     # Ensure name is not empty and amount is positive
     if input_name and input_amount > 0:
         # Create a new Expense object and add it once
-        new_expense = Expense(input_date, input_category, input_name, str(input_amount))
-        manager.add_expense(new_expense)
-
-        st.sidebar.success("Added successfully!")
+        new_expense = Expense(input_date, input_category, input_name, Money.from_value(input_amount))
+        try:
+            manager.add_expense(new_expense)
+            st.sidebar.success("Added successfully!")
+        except ConnectionError as e:
+            st.sidebar.error(str(e))
     else:
         st.sidebar.error("Please fill all fields correctly.")
 
@@ -50,12 +83,16 @@ st.sidebar.header("💳 Monthly Budget")
 # Load current budget
 current_budget = manager.get_budget()
 # Update budget
-new_budget = st.sidebar.number_input("Set Budget (NIS)", value=current_budget, min_value=0.0, step=100.0)
+new_budget = st.sidebar.number_input("Set Budget (NIS)", value=min(float(current_budget), MAX_AMOUNT),
+                                     min_value=0.0, max_value=MAX_AMOUNT, step=100.0)
 
 if st.sidebar.button("Update Budget"):
-    manager.set_budget(new_budget)
-    st.sidebar.success("Budget Updated!")
-    st.rerun()
+    try:
+        manager.set_budget(Money.from_value(new_budget))
+        st.sidebar.success("Budget Updated!")
+        st.rerun()
+    except ConnectionError as e:
+        st.sidebar.error(str(e))
 
 # Time Filter
 st.sidebar.markdown("---")
@@ -74,13 +111,13 @@ if st.sidebar.button("📊 Run Analysis"):
     # Perform trend analysis using utils
     curr, avg = manager.get_spending_analysis(selected_period)
     is_high = curr > avg
-    if avg > 0:
+    if avg.cents > 0:
         if is_high:
-            st.sidebar.error(f"⚠️ High Spending! You passed your average of {avg:,.0f} NIS.")
+            st.sidebar.error(f"⚠️ High Spending! You passed your average of {float(avg):,.0f} NIS.")
         else:
-            st.sidebar.success(f"✅ Good Job! You are below your average of {avg:,.0f} NIS.")
+            st.sidebar.success(f"✅ Good Job! You are below your average of {float(avg):,.0f} NIS.")
             # Display current spend context for better UX
-            st.sidebar.markdown(f"*(Current: {curr:,.0f} ₪)*") 
+            st.sidebar.markdown(f"*(Current: {float(curr):,.0f} ₪)*") 
     else:
         st.sidebar.info("Insufficient data history for trend analysis.")
     
@@ -106,23 +143,21 @@ with tab1:
     # Check if there are expenses to display
     if filtered_expenses:
         data = []
-        i = 1
         for exp in filtered_expenses:
             date_obj = exp.date  
             data.append({
-                "Number": i, 
+                "ID": exp.id, 
                 "Date": date_obj,  
                 "Category": exp.category, 
                 "Name": exp.name, 
                 "Amount": float(exp.amount) 
             })
-            i += 1
         st.dataframe(
             data,
             hide_index=True,
             use_container_width=True,
             column_config={
-                "Number": st.column_config.NumberColumn("#", format="%d", width="small"),
+                "ID": st.column_config.NumberColumn("ID", format="%d", width="small"),
                 "Date": st.column_config.DateColumn("Date", format="DD/MM/YYYY"), 
                 "Amount": st.column_config.NumberColumn("Amount", format="%.2f ₪"), 
                 "Category": st.column_config.TextColumn("Category"),
@@ -133,15 +168,18 @@ with tab1:
         
         #st.divider()
         st.write("### Delete Expense")
-        st.caption("Note: To delete, please ensure you are viewing 'All History' or find the specific expense ID.")
+        st.caption("Enter the ID shown in the table.")
 
-        del_num = st.number_input("Enter line number to delete", min_value=1, step=1)
+        # Delete by ID, not by row position: the list is shared with other tabs of this user
+        del_id = st.number_input("Enter expense ID to delete", min_value=1, step=1)
         if st.button("Delete"):
-            if selected_period != "All History":
-                st.error("Please switch to 'All History' to delete items by index accurately.")
-            else:
-                manager.delete_expense(del_num - 1)
-                st.rerun() 
+            try:
+                if manager.delete_expense_by_id(int(del_id)):
+                    st.rerun() 
+                else:
+                    st.error(f"No expense with ID {int(del_id)}.")
+            except ConnectionError as e:
+                st.error(str(e))
     else:
         st.info(f"No expenses found for {selected_period}.")
 
@@ -152,20 +190,13 @@ with tab2:
     else:
         st.subheader(f"Overview for {target_month_str}")
 
-    period_total = 0
-    category_totals = {}
-
-    for exp in filtered_expenses:
-        try:
-            amt = float(exp.amount)
-            period_total += amt
-            category_totals[exp.category] = category_totals.get(exp.category, 0) + amt
-        except ValueError:
-            # Skip invalid amounts to keep the dashboard robust
-            continue
+    # Exact integer-cent sums; convert to floats only for display
+    total_cents, category_cents = sum_by_category(filtered_expenses)
+    period_total = total_cents / 100
+    category_totals = {cat: cents / 100 for cat, cents in category_cents.items()}
 
     # Calculate remaining budget
-    budget = manager.get_budget()
+    budget = float(manager.get_budget())
 
     if selected_period == "All History":
         st.metric("Total Spent (All Time)", f"{period_total:,.0f} ₪")
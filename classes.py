@@ -1,7 +1,15 @@
 import psycopg2
+from psycopg2 import sql
+import hashlib
 import os
+import threading
+import time
 from dotenv import load_dotenv, find_dotenv # Load database credentials from environment variables.
-from datetime import datetime
+from datetime import date, datetime
+from money import Money
+from snapshot import save_snapshot, load_snapshot
+from utils import sum_by_category, get_monthly_totals
+from validations import RECURRING_FREQUENCIES
 
 load_dotenv(find_dotenv())
 
@@ -10,116 +18,416 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_NAME = os.getenv("DB_NAME", "expenses_db")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASS = os.getenv("DB_PASS") 
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))  # seconds
+
+# Local snapshot cache (warm start + read-only offline mode)
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", ".snapshots")
+SYNC_RETRY_SECONDS = 30
+
+# Tenant used when no user is given (and owner of rows created before multi-user support)
+DEFAULT_USER_ID = os.getenv("APP_USER_ID", "default")
+MAX_USER_ID_LENGTH = 100  # Matches the VARCHAR(100) user_id columns
 
 if not DB_PASS:
     raise ValueError("Database password not found. Please set DB_PASS in your .env file.")
+
+def partition_name(user_id):
+    """
+    Returns the name of the expenses partition that holds a user's rows.
+    The user_id is hashed so any string is safe to use in a table name.
+    """
+    return "expenses_u_" + hashlib.md5(user_id.encode("utf-8")).hexdigest()[:16]
+
 class ExpenseManager:
-    # Manages expense CRUD operations against the PostgreSQL database. 
+    # Manages one user's expense CRUD operations against the PostgreSQL database. 
 
-    def __init__(self):
-        self.expenses = []  # In-memory list of Expense objects
+    def __init__(self, user_id=DEFAULT_USER_ID, create_user=True):
+        if not user_id or len(user_id) > MAX_USER_ID_LENGTH:
+            raise ValueError(f"User ID must be 1-{MAX_USER_ID_LENGTH} characters.")
+        self.user_id = user_id
+        self.create_user = create_user  # If False, an unknown user_id raises ValueError instead of being provisioned
+        self.expenses = []  # In-memory list of Expense objects (this user only)
+        self.read_only = False  # True while the database is unreachable and data comes from the snapshot
+        self.snapshot_path = os.path.join(SNAPSHOT_DIR, partition_name(user_id) + ".snap")
+        self._max_synced_id = 0  # Sync watermark: highest expense ID fetched from the database
+        self._budget_cents = 0
+        self._lock = threading.Lock()  # Guards self.expenses against the background sync
+        self._sync_thread = None
+        # IDs added/deleted locally while reconcile_with_db is between its fetch and its merge
+        self._added_since_fetch = set()
+        self._deleted_since_fetch = set()
+        self._materialized_on = None  # Last day recurring expenses were materialized up to today
         
+        # Warm start: serve the local snapshot immediately and reconcile with the database in the background.
+        # Without a snapshot, sync in the foreground (first run).
+        if self.load_snapshot():
+            self._start_background_sync()
+        else:
+            self.sync()
+
+    def get_connection(self):
+        """
+        Returns a new database connection.
+        Raises ConnectionError if the database is unreachable.
+        """
+        try:
+            return psycopg2.connect(
+                host=DB_HOST,
+                database=DB_NAME,
+                user=DB_USER,
+                password=DB_PASS,
+                connect_timeout=DB_CONNECT_TIMEOUT
+            )
+        except psycopg2.OperationalError as e:
+            raise ConnectionError(f"Database unreachable: {e}") from e
+
+    def _serve_from_snapshot(self):
+        """
+        True while offline or while the warm-start sync is still running,
+        so reads never block on a database connection attempt.
+        """
+        return self.read_only or (self._sync_thread is not None and self._sync_thread.is_alive())
+
+    def _go_offline(self):
+        """
+        Switches to read-only snapshot mode and keeps trying to reconnect in the background.
+        """
+        self.read_only = True
+        self._start_background_sync()
+
+    def _require_online(self):
+        """
+        Raises ConnectionError when running read-only from the local snapshot.
+        """
+        if self.read_only:
+            raise ConnectionError("Database unreachable - running read-only from the local snapshot.")
+
+    # Sync & Snapshot Methods
+
+    def sync(self):
+        """
+        Brings the schema, recurring expenses and in-memory list up to date with the database,
+        then refreshes the local snapshot. Raises ConnectionError if the database is unreachable.
+        """
         # Initialize Database Tables
         self.create_tables()
+        self.read_only = False
+        
+        # Insert any recurring expenses that came due since the last run
+        self.materialize_recurring(update_memory=False)
         
-        # Load data immediately upon instantiation from the Database
-        self.load_from_db()
+        # After a snapshot only fetch what changed, otherwise load everything (first run)
+        if self._max_synced_id:
+            self.reconcile_with_db()
+        else:
+            self.load_from_db()
+        self._fetch_budget()
+        self.save_snapshot()
 
-    def get_connection(self):
+    def _start_background_sync(self):
         """
-        Returns a new database connection.
+        Starts the background sync thread unless one is already running.
         """
-        return psycopg2.connect(
-            host=DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS
-        )
+        with self._lock:
+            if self._sync_thread and self._sync_thread.is_alive():
+                return
+            self._sync_thread = threading.Thread(target=self._sync_in_background, daemon=True)
+            self._sync_thread.start()
+
+    def _sync_in_background(self):
+        # Keep retrying until the database is reachable again; stay read-only meanwhile
+        while True:
+            try:
+                self.sync()
+                return
+            except ConnectionError as e:
+                self.read_only = True
+                print(f"Working offline from local snapshot: {e}")
+            time.sleep(SYNC_RETRY_SECONDS)
+
+    def load_snapshot(self):
+        """
+        Fills the in-memory list from the local snapshot file.
+        Returns True if a snapshot was found.
+        """
+        snapshot = load_snapshot(self.snapshot_path)
+        if not snapshot:
+            return False
+        header, cols = snapshot
+        currency = header["currency"]
+        expenses = [
+            Expense(date.fromordinal(day).strftime("%d/%m/%Y") if day else "",
+                    category, name, Money(cents, currency), exp_id or None)
+            for exp_id, day, category, name, cents in zip(cols["id"], cols["date"], cols["category"],
+                                                          cols["name"], cols["cents"])
+        ]
+        with self._lock:
+            self.expenses = expenses
+            self._max_synced_id = (header["watermark"] or {}).get("max_id", 0)
+            self._budget_cents = header["budget_cents"]
+        return True
+
+    def save_snapshot(self):
+        """
+        Writes the in-memory list, budget and sync watermark to the local snapshot file.
+        """
+        with self._lock:
+            expenses = list(self.expenses)
+            watermark = {"max_id": self._max_synced_id, "synced_at": datetime.now().isoformat()}
+        try:
+            save_snapshot(self.snapshot_path, expenses, watermark, self._budget_cents)
+        except (OSError, OverflowError, ValueError) as e:
+            # The snapshot is only a cache; never fail a DB operation because of it
+            print(f"Could not save local snapshot: {e}")
+
+    def reconcile_with_db(self):
+        """
+        Merges database changes into the in-memory list: fetches rows whose IDs
+        are not in memory yet and drops rows deleted elsewhere.
+        """
+        conn = self.get_connection()
+        cur = conn.cursor()
+        # From here on, local adds/deletes are tracked so the merge below doesn't undo them
+        with self._lock:
+            self._added_since_fetch = set()
+            self._deleted_since_fetch = set()
+        cur.execute("SELECT id FROM expenses WHERE user_id = %s", (self.user_id,))
+        db_ids = {row[0] for row in cur.fetchall()}
+        with self._lock:
+            missing_ids = list(db_ids - {exp.id for exp in self.expenses} - self._deleted_since_fetch)
+        # Fetch by ID, not "id > watermark": sequence IDs can commit out of order
+        rows = []
+        if missing_ids:
+            cur.execute("""
+                SELECT date, category, name, amount, id FROM expenses
+                WHERE user_id = %s AND id = ANY(%s);
+            """, (self.user_id, missing_ids))
+            rows = cur.fetchall()
+        cur.close()
+        conn.close()
+
+        with self._lock:
+            known_ids = {exp.id for exp in self.expenses}
+            # Keep rows still in the DB plus rows added locally after the ID fetch
+            keep_ids = db_ids | self._added_since_fetch
+            merged = [exp for exp in self.expenses if exp.id in keep_ids]
+            merged += [self._row_to_expense(row) for row in rows
+                       if row[4] not in known_ids and row[4] not in self._deleted_since_fetch]
+            self.expenses = merged
+            self._max_synced_id = max(db_ids, default=0)
 
     def create_tables(self):
         """
-        Creates the necessary tables (expenses, budget) in the database if they do not exist.
+        Creates the necessary tables (expenses, budget) in the database if they do not exist,
+        plus this user's expenses partition and budget row.
         """
         conn = self.get_connection()
         cur = conn.cursor()
-        
-        # Create expenses table
+
+        # Shared schema changes lock every user's partition, so only run them when something is missing
+        if not self._schema_is_current(cur):
+            self._migrate_schema(cur)
+
+        # Per-user setup: every provisioned user has a budget row
+        cur.execute("SELECT 1 FROM budget WHERE user_id = %s", (self.user_id,))
+        if cur.fetchone() is None:
+            if not self.create_user:
+                conn.commit()  # Keep any shared schema migration
+                cur.close()
+                conn.close()
+                raise ValueError(f"Unknown user: {self.user_id}")
+            # New user: create their partition and budget row
+            self._ensure_partition(cur, self.user_id)
+            cur.execute("""
+                INSERT INTO budget (user_id, amount) VALUES (%s, 0)
+                ON CONFLICT (user_id) DO NOTHING;
+            """, (self.user_id,))
+
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    def _schema_is_current(self, cur):
+        """
+        Returns True if all shared tables, columns and indexes already exist (read-only catalog check).
+        """
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS expenses (
-            id SERIAL PRIMARY KEY,
-            date DATE,  
-            category VARCHAR(50),
-            name VARCHAR(100),
-            amount NUMERIC
+            SELECT COALESCE((SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('expenses')), false)
+                AND to_regclass('expenses_recurring_idx') IS NOT NULL
+                AND to_regclass('recurring_expenses') IS NOT NULL
+                AND to_regclass('recurring_expenses_user_idx') IS NOT NULL
+                AND to_regclass('budget_user_id_idx') IS NOT NULL;
+        """)
+        return cur.fetchone()[0] and self._column_exists(cur, "expenses", "recurring_id") \
+            and self._column_exists(cur, "budget", "user_id")
+
+    def _migrate_schema(self, cur):
+        """
+        Creates or upgrades the shared tables (expenses, recurring_expenses, budget).
+        Every statement is idempotent; runs only on first start or after an upgrade.
+        """
+        # Serialize schema changes between managers starting at the same time
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('expenses_schema'))")
+
+        # Expenses are partitioned by owner, so a user's queries only scan their own partition
+        cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('expenses')")
+        existing = cur.fetchone()
+        if existing and existing[0] != 'p':
+            self._migrate_legacy_expenses(cur)
+        else:
+            self._create_partitioned_expenses(cur)
+
+        # Link generated expenses to their recurring rule; the unique index makes
+        # materialization idempotent (one row per rule per date)
+        if not self._column_exists(cur, "expenses", "recurring_id"):
+            cur.execute("ALTER TABLE expenses ADD COLUMN recurring_id INTEGER")
+        cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS expenses_recurring_idx
+            ON expenses (user_id, recurring_id, date);
+        """)
+
+        # Create recurring rules table (subscriptions, bills...)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS recurring_expenses (
+                id SERIAL PRIMARY KEY,
+                user_id VARCHAR(100) NOT NULL,
+                category VARCHAR(50),
+                name VARCHAR(100),
+                amount NUMERIC,
+                frequency VARCHAR(10) NOT NULL,
+                interval_days INTEGER,
+                start_date DATE NOT NULL,
+                end_date DATE,
+                materialized_through DATE
             );
         """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS recurring_expenses_user_idx
+            ON recurring_expenses (user_id);
+        """)
         
-        # Create budget table (single row logic)
+        # Create budget table (one row per user)
         cur.execute("""
             CREATE TABLE IF NOT EXISTS budget (
                 id SERIAL PRIMARY KEY,
                 amount NUMERIC
             );
         """)
-        
-        # Initialize budget with 0 if table is empty
-        cur.execute("SELECT count(*) FROM budget")
-        if cur.fetchone()[0] == 0:
-            cur.execute("INSERT INTO budget (amount) VALUES (0)")
+        # Older single-row budgets belong to the default user
+        if not self._column_exists(cur, "budget", "user_id"):
+            cur.execute("ALTER TABLE budget ADD COLUMN user_id VARCHAR(100)")
+            cur.execute("UPDATE budget SET user_id = %s WHERE user_id IS NULL", (DEFAULT_USER_ID,))
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS budget_user_id_idx ON budget (user_id)")
 
-        conn.commit()
-        cur.close()
-        conn.close()
+    def _column_exists(self, cur, table, column):
+        """
+        Checks the catalog for a column (ALTER TABLE ... IF NOT EXISTS would lock the table first).
+        """
+        cur.execute("""
+            SELECT EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s);
+        """, (table, column))
+        return cur.fetchone()[0]
+
+    def _create_partitioned_expenses(self, cur):
+        """
+        Creates the expenses table partitioned by user_id (no-op if it exists).
+        """
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS expenses (
+            id SERIAL,
+            user_id VARCHAR(100) NOT NULL,
+            date DATE,  
+            category VARCHAR(50),
+            name VARCHAR(100),
+            amount NUMERIC,
+            PRIMARY KEY (user_id, id)
+            ) PARTITION BY LIST (user_id);
+        """)
+
+    def _ensure_partition(self, cur, user_id):
+        """
+        Creates the expenses partition for a user if it does not exist yet.
+        """
+        # Creating a partition locks the parent table, so check the catalog first
+        cur.execute("SELECT to_regclass(%s)", (partition_name(user_id),))
+        if cur.fetchone()[0]:
+            return
+        cur.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF expenses FOR VALUES IN ({})").format(
+            sql.Identifier(partition_name(user_id)), sql.Literal(user_id)))
+
+    def _migrate_legacy_expenses(self, cur):
+        """
+        Converts a pre-multi-user (unpartitioned) expenses table into the partitioned layout.
+        Existing rows are assigned to DEFAULT_USER_ID and keep their IDs.
+        """
+        cur.execute("ALTER TABLE expenses RENAME TO expenses_legacy")
+        self._create_partitioned_expenses(cur)
+        self._ensure_partition(cur, DEFAULT_USER_ID)
+
+        cur.execute("""
+            INSERT INTO expenses (id, user_id, date, category, name, amount)
+            SELECT id, %s, date, category, name, amount FROM expenses_legacy;
+        """, (DEFAULT_USER_ID,))
+        # Continue the ID sequence after the copied rows
+        cur.execute("""
+            SELECT setval(pg_get_serial_sequence('expenses', 'id'), COALESCE(MAX(id), 0) + 1, false)
+            FROM expenses;
+        """)
+        cur.execute("DROP TABLE expenses_legacy")
 
     def load_from_db(self):
         """
-        Fetches all expenses from the database and populates the in-memory list.
+        Fetches this user's expenses from the database and populates the in-memory list.
         """
-        self.expenses = []
         conn = self.get_connection()
         cur = conn.cursor()
         
         # Select all columns including the unique ID
-        cur.execute("SELECT date, category, name, amount, id FROM expenses")
+        cur.execute("SELECT date, category, name, amount, id FROM expenses WHERE user_id = %s", (self.user_id,))
         rows = cur.fetchall()
         
-        for row in rows:
-            raw_date = row[0]
-            if isinstance(raw_date, datetime) or hasattr(raw_date, 'strftime'):
-                clean_date = raw_date.strftime("%d/%m/%Y")
-            elif isinstance(raw_date, str) and "-" in raw_date:
-                try:
-                    dt_obj = datetime.strptime(raw_date, "%Y-%m-%d")
-                    clean_date = dt_obj.strftime("%d/%m/%Y")
-                except ValueError:
-                    clean_date = raw_date # Fallback
-            else:
-                clean_date = str(raw_date)
-            new_expense = Expense(clean_date, row[1], row[2], float(row[3]), row[4])
-            self.expenses.append(new_expense)
-            
+        expenses = [self._row_to_expense(row) for row in rows]
+        with self._lock:
+            self.expenses = expenses
+            self._max_synced_id = max((exp.id for exp in expenses), default=0)
             
         cur.close()
         conn.close()
 
+    def _row_to_expense(self, row):
+        """
+        Builds an Expense from a (date, category, name, amount, id) database row.
+        """
+        raw_date = row[0]
+        if isinstance(raw_date, datetime) or hasattr(raw_date, 'strftime'):
+            clean_date = raw_date.strftime("%d/%m/%Y")
+        elif isinstance(raw_date, str) and "-" in raw_date:
+            try:
+                dt_obj = datetime.strptime(raw_date, "%Y-%m-%d")
+                clean_date = dt_obj.strftime("%d/%m/%Y")
+            except ValueError:
+                clean_date = raw_date # Fallback
+        else:
+            clean_date = str(raw_date)
+        return Expense(clean_date, row[1], row[2], Money.from_value(row[3]), row[4])
+
     def add_expense(self, expense):
         """
         Adds an expense to the database and in-memory list.
         """
+        self._require_online()
         conn = self.get_connection()
         cur = conn.cursor()
         
-        try:
-            dt_obj = datetime.strptime(expense.date, "%d/%m/%Y")
-            formatted_date = dt_obj.strftime("%Y-%m-%d")
-        except ValueError:
-            formatted_date = expense.date
+        # Accepts DD/MM/YYYY strings (CLI) and date objects (dashboard)
+        formatted_date = to_sql_date(expense.date)
 
         # Insert into DB and return the generated ID
         cur.execute("""
-            INSERT INTO expenses (date, category, name, amount)
-            VALUES (%s, %s, %s, %s) RETURNING id;
-        """, (formatted_date, expense.category, expense.name, expense.amount))
+            INSERT INTO expenses (user_id, date, category, name, amount)
+            VALUES (%s, %s, %s, %s, %s) RETURNING id;
+        """, (self.user_id, formatted_date, expense.category, expense.name, expense.amount.to_decimal()))
         
         new_id = cur.fetchone()[0]
         expense.id = new_id  # Assign the DB ID to the object
@@ -129,29 +437,50 @@ class ExpenseManager:
         conn.close()
         
         # Add to memory
-        self.expenses.append(expense)
+        with self._lock:
+            self.expenses.append(expense)
+            self._added_since_fetch.add(expense.id)
+        self.save_snapshot()
         print("\nExpense added to Database and memory!\n")
 
     def delete_expense(self, expense_index):
         """
-        Removes an expense from the list and the database based on its list index.
+        Removes an expense from the list and the database based on its list index (CLI numbering).
         """
-        if 0 <= expense_index < len(self.expenses):
-            expense_to_remove = self.expenses[expense_index]
-            
-            # Delete from Database using the unique ID
-            conn = self.get_connection()
-            cur = conn.cursor()
-            cur.execute("DELETE FROM expenses WHERE id = %s", (expense_to_remove.id,))
-            conn.commit()
-            cur.close()
-            conn.close()
-            
-            # Remove from memory
-            removed_item = self.expenses.pop(expense_index)
-            print(f"Deleted: {removed_item.name} from Database and memory!") 
-        else:
+        with self._lock:
+            expense_id = self.expenses[expense_index].id if 0 <= expense_index < len(self.expenses) else None
+        if expense_id is None:
             print("Error: Invalid expense number.")
+            return
+        self.delete_expense_by_id(expense_id)
+
+    def delete_expense_by_id(self, expense_id):
+        """
+        Removes an expense from the database and the list by its unique ID.
+        Safe when other sessions change the list meanwhile. Returns True if it was found.
+        """
+        self._require_online()
+        
+        # Delete from Database using the unique ID
+        conn = self.get_connection()
+        cur = conn.cursor()
+        cur.execute("DELETE FROM expenses WHERE user_id = %s AND id = %s RETURNING name",
+                    (self.user_id, expense_id))
+        deleted = cur.fetchone()
+        conn.commit()
+        cur.close()
+        conn.close()
+        
+        # Remove from memory
+        with self._lock:
+            self.expenses = [exp for exp in self.expenses if exp.id != expense_id]
+            self._deleted_since_fetch.add(expense_id)
+        self.save_snapshot()
+        if deleted:
+            print(f"Deleted: {deleted[0]} from Database and memory!") 
+        else:
+            print("Error: Expense not found.")
+        return deleted is not None
 
     def print_all_expenses(self):
         """
@@ -167,55 +496,60 @@ class ExpenseManager:
         Calculates and prints the total expenses grouped by category.
         """
         print("\n--- Expenses by Category ---")
-        totals = {}
-        for exp in self.expenses:
-            # Clean and convert amount to float
-            try:
-                amount = float(exp.amount)
-            except ValueError:
-                amount = 0.0
-            
-            if exp.category in totals:
-                totals[exp.category] += amount
-            else:
-                totals[exp.category] = amount
+        _, totals = sum_by_category(self.expenses)
         
-        for cat, amount in totals.items():
-            print(f"{cat}: {amount} NIS")
+        for cat, cents in totals.items():
+            print(f"{cat}: {Money(cents)} NIS")
         print("-" * 20 + "\n")
 
     # Budget Management Methods 
 
     def set_budget(self, amount):
         """
-        Updates the budget amount in the database.
+        Updates the budget amount (Money) in the database.
         """
+        self._require_online()
         conn = self.get_connection()
         cur = conn.cursor()
-        cur.execute("UPDATE budget SET amount = %s", (amount,))
+        cur.execute("UPDATE budget SET amount = %s WHERE user_id = %s", (amount.to_decimal(), self.user_id))
         conn.commit()
         cur.close()
         conn.close()
+        self._budget_cents = amount.cents
+        self.save_snapshot()
 
     def get_budget(self):
         """
-        Loads the budget from the database. Returns 0 if not set.
+        Loads the budget from the database as Money. Returns 0 if not set.
+        Offline (or during the warm-start sync), returns the budget stored in the local snapshot.
+        """
+        if not self._serve_from_snapshot():
+            try:
+                return self._fetch_budget()
+            except ConnectionError:
+                self._go_offline()
+        return Money(self._budget_cents)
+
+    def _fetch_budget(self):
+        """
+        Reads the budget from the database and caches it for offline use.
+        Raises ConnectionError if the database is unreachable.
         """
         conn = self.get_connection()
         cur = conn.cursor()
-        cur.execute("SELECT amount FROM budget LIMIT 1")
+        cur.execute("SELECT amount FROM budget WHERE user_id = %s", (self.user_id,))
         result = cur.fetchone()
         cur.close()
         conn.close()
-        return float(result[0]) if result else 0.0
+        budget = Money.from_value(result[0]) if result else Money(0)
+        self._budget_cents = budget.cents
+        return budget
 
     def get_spending_analysis(self,selected_month_str=None):
         """
-        Analyzes spending based on the selected month.
+        Analyzes this user's spending based on the selected month.
+        Returns (selected_month_total, average_spending) as Money.
         """
-        conn = self.get_connection()
-        cur = conn.cursor()
-
         target_date = datetime.today()
         
         if selected_month_str and selected_month_str != "All History":
@@ -224,6 +558,20 @@ class ExpenseManager:
             except ValueError:
                 pass
 
+        if not self._serve_from_snapshot():
+            try:
+                return self._spending_analysis_from_db(target_date)
+            except ConnectionError:
+                self._go_offline()
+        return self._spending_analysis_from_memory(target_date)
+
+    def _spending_analysis_from_db(self, target_date):
+        """
+        Runs the spending analysis queries. Raises ConnectionError if the database is unreachable.
+        """
+        conn = self.get_connection()
+        cur = conn.cursor()
+
         target_date_sql = target_date.strftime('%Y-%m-%d')
         # Calculate average monthly spending from all months BEFORE current month
         cur.execute("""
@@ -231,36 +579,225 @@ class ExpenseManager:
             FROM (
                 SELECT SUM(amount) as monthly_total
                 FROM expenses
-                WHERE date::DATE < %s::DATE
+                WHERE user_id = %s AND date::DATE < %s::DATE
                 GROUP BY DATE_TRUNC('month', date::DATE)
             ) sub;
-        """, (target_date_sql,))
+        """, (self.user_id, target_date_sql))
 
         avg_result = cur.fetchone()[0]
-        average_spending = float(avg_result) if avg_result else 0.0
+        average_spending = Money.from_value(avg_result) if avg_result else Money(0)
 
         # Calculate total spending for the current month
         cur.execute("""
             SELECT SUM(amount)
             FROM expenses
-            WHERE DATE_TRUNC('month', date::DATE) = DATE_TRUNC('month', %s::DATE);
-        """, (target_date_sql,))
+            WHERE user_id = %s AND DATE_TRUNC('month', date::DATE) = DATE_TRUNC('month', %s::DATE);
+        """, (self.user_id, target_date_sql))
 
         curr_result = cur.fetchone()[0]
-        selected_month_total = float(curr_result) if curr_result else 0.0
+        selected_month_total = Money.from_value(curr_result) if curr_result else Money(0)
 
         cur.close()
         conn.close()
 
         return selected_month_total, average_spending
 
+    def _spending_analysis_from_memory(self, target_date):
+        """
+        Offline version of get_spending_analysis computed from the in-memory list.
+        """
+        with self._lock:
+            expenses = list(self.expenses)
+        previous = get_monthly_totals(expenses, before=target_date.date())
+        average_spending = Money(_div_half_up(sum(previous.values()), len(previous))) if previous else Money(0)
+        current = get_monthly_totals(expenses).get((target_date.year, target_date.month), 0)
+        return Money(current), average_spending
+
+    # Recurring Expense Methods
+
+    def add_recurring_rule(self, rule):
+        """
+        Saves a recurring rule to the database and materializes any occurrences already due.
+        Returns the number of expenses created.
+        """
+        self._require_online()
+        if rule.frequency not in RECURRING_FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {rule.frequency}")
+        if rule.frequency == "weekly":
+            rule.interval_days = 7
+        if rule.frequency != "monthly" and (not rule.interval_days or rule.interval_days < 1):
+            raise ValueError("interval_days must be a positive number of days.")
+
+        conn = self.get_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO recurring_expenses
+                (user_id, category, name, amount, frequency, interval_days, start_date, end_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id;
+        """, (self.user_id, rule.category, rule.name, rule.amount.to_decimal(), rule.frequency,
+              rule.interval_days, to_sql_date(rule.start_date), to_sql_date(rule.end_date)))
+        rule.id = cur.fetchone()[0]
+        conn.commit()
+        cur.close()
+        conn.close()
+
+        # Backfill occurrences between start_date and today
+        return self.materialize_recurring()
+
+    def get_recurring_rules(self):
+        """
+        Returns this user's recurring rules as a list of RecurringRule objects.
+        """
+        conn = self.get_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT category, name, amount, frequency, start_date, interval_days, end_date, id
+            FROM recurring_expenses WHERE user_id = %s ORDER BY id;
+        """, (self.user_id,))
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+        return [RecurringRule(row[0], row[1], Money.from_value(row[2]), row[3], row[4],
+                              row[5], row[6], row[7]) for row in rows]
+
+    def delete_recurring_rule(self, rule_id):
+        """
+        Deletes a recurring rule. Expenses it already generated are kept.
+        """
+        self._require_online()
+        conn = self.get_connection()
+        cur = conn.cursor()
+        cur.execute("DELETE FROM recurring_expenses WHERE user_id = %s AND id = %s",
+                    (self.user_id, rule_id))
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    def materialize_recurring(self, up_to=None, update_memory=True):
+        """
+        Inserts every due occurrence of this user's recurring rules up to the given date (default today).
+        All rules and all missed periods are generated and inserted in one SQL statement.
+        Safe to call repeatedly: occurrences that already exist are skipped.
+        Returns the number of new expenses created.
+        """
+        up_to_sql = to_sql_date(up_to) if up_to else datetime.today().strftime("%Y-%m-%d")
+
+        conn = self.get_connection()
+        cur = conn.cursor()
+        # Occurrence k of a rule is start_date + k periods (computed from start_date,
+        # so monthly rules on the 31st don't drift after short months)
+        cur.execute("""
+            WITH bounds AS (
+                SELECT r.id, r.category, r.name, r.amount, r.frequency, r.interval_days,
+                       r.start_date, r.materialized_through,
+                       LEAST(COALESCE(r.end_date, %(up_to)s::DATE), %(up_to)s::DATE) AS last_date
+                FROM recurring_expenses r
+                WHERE r.user_id = %(user_id)s AND r.start_date <= %(up_to)s::DATE
+            ),
+            due AS (
+                SELECT b.id AS recurring_id, occ.date, b.category, b.name, b.amount
+                FROM bounds b
+                CROSS JOIN LATERAL generate_series(0,
+                    CASE WHEN b.frequency = 'monthly'
+                         THEN ((EXTRACT(YEAR FROM b.last_date) - EXTRACT(YEAR FROM b.start_date)) * 12
+                               + EXTRACT(MONTH FROM b.last_date) - EXTRACT(MONTH FROM b.start_date))::INT
+                         ELSE (b.last_date - b.start_date) / b.interval_days
+                    END) AS k
+                CROSS JOIN LATERAL (
+                    SELECT (CASE WHEN b.frequency = 'monthly'
+                                 THEN b.start_date + k * INTERVAL '1 month'
+                                 ELSE b.start_date + k * b.interval_days * INTERVAL '1 day'
+                            END)::DATE AS date
+                ) occ
+                WHERE occ.date <= b.last_date
+                  AND (b.materialized_through IS NULL OR occ.date > b.materialized_through)
+            ),
+            inserted AS (
+                INSERT INTO expenses (user_id, recurring_id, date, category, name, amount)
+                SELECT %(user_id)s, recurring_id, date, category, name, amount FROM due
+                ON CONFLICT (user_id, recurring_id, date) DO NOTHING
+                RETURNING date, category, name, amount, id
+            ),
+            watermark AS (
+                -- Never move the watermark backwards (would re-create deleted occurrences)
+                UPDATE recurring_expenses r
+                SET materialized_through = GREATEST(COALESCE(r.materialized_through, b.last_date), b.last_date)
+                FROM bounds b WHERE r.id = b.id
+            )
+            SELECT date, category, name, amount, id FROM inserted;
+        """, {"user_id": self.user_id, "up_to": up_to_sql})
+        rows = cur.fetchall()
+        conn.commit()
+        cur.close()
+        conn.close()
+
+        if not up_to:
+            self._materialized_on = date.today()
+        if update_memory and rows:
+            with self._lock:
+                self.expenses.extend(self._row_to_expense(row) for row in rows)
+                self._added_since_fetch.update(row[4] for row in rows)
+            self.save_snapshot()
+        return len(rows)
+
+    def materialize_if_due(self):
+        """
+        Materializes recurring expenses if that has not happened yet today.
+        Cheap to call on every dashboard rerun; a no-op while offline or during the warm-start sync.
+        """
+        if self._serve_from_snapshot() or self._materialized_on == date.today():
+            return 0
+        try:
+            return self.materialize_recurring()
+        except ConnectionError:
+            self._go_offline()
+            return 0
+
 class Expense:
     """
-    Represents a single expense record.
+    Represents a single expense record. The amount is normalized to Money.
     """
     def __init__(self, date, category, name, amount, id=None): 
         self.id = id
         self.date = date
         self.category = category
         self.name = name
-        self.amount = amount
\ No newline at end of file
+        self.amount = Money.from_value(amount)
+
+class RecurringRule:
+    """
+    Represents a recurring expense (subscription, bill...).
+    frequency is one of RECURRING_FREQUENCIES; interval_days is used by "custom" rules.
+    """
+    def __init__(self, category, name, amount, frequency, start_date, interval_days=None, end_date=None, id=None):
+        self.id = id
+        self.category = category
+        self.name = name
+        self.amount = Money.from_value(amount)
+        self.frequency = frequency
+        self.interval_days = interval_days
+        self.start_date = start_date
+        self.end_date = end_date
+
+def _div_half_up(total, count):
+    """
+    Integer division rounded half away from zero, matching Decimal ROUND_HALF_UP on the DB path.
+    """
+    quotient, remainder = divmod(abs(total), count)
+    if remainder * 2 >= count:
+        quotient += 1
+    return quotient if total >= 0 else -quotient
+
+def to_sql_date(date):
+    """
+    Converts a DD/MM/YYYY string (or date object) to the YYYY-MM-DD format used by the database.
+    Returns None for empty values.
+    """
+    if not date:
+        return None
+    if hasattr(date, 'strftime'):
+        return date.strftime("%Y-%m-%d")
+    try:
+        return datetime.strptime(date, "%d/%m/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return date
@@ -0,0 +1,391 @@
+"""
+Load test for the Streamlit dashboard.
+
+Drives app.py headlessly with Streamlit's AppTest across N simulated sessions
+(split over several worker processes, one thread per session - like a real Streamlit
+server) doing a mix of add / filter / analyze / delete against the PostgreSQL database
+configured in .env, then reports rerun latency percentiles, database connection counts
+and per-process memory. Each run uses fresh loadtest-<run id>-* users, which are
+removed at the end.
+
+Usage:
+    python load_test.py --sessions 20 --workers 4 --iterations 25
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# Every rerun of app.py is timed and tagged with the action that triggered it
+ACTION_WEIGHTS = {
+    "add": 25,
+    "filter": 30,
+    "analyze": 20,
+    "delete": 10,
+    "view": 15,
+}
+
+
+def percentile(sorted_values, pct):
+    """
+    Returns the nearest-rank percentile of an already sorted list (0 if empty).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _widget(widgets, label):
+    """
+    Finds an AppTest widget by its label. Returns None if it is not rendered.
+    """
+    for w in widgets:
+        if w.label == label:
+            return w
+    return None
+
+
+class SimulatedSession:
+    """
+    One browser session of the dashboard, backed by its own AppTest instance.
+    """
+    def __init__(self, user_id, timeout, rng):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = rng
+        self.timeout = timeout
+        self.at = AppTest.from_file("app.py", default_timeout=timeout)
+        self.at.query_params["user"] = user_id
+        self.added = 0
+
+    def run(self, action, samples, errors):
+        """
+        Reruns the script, recording the latency under the given action name.
+        """
+        start = time.perf_counter()
+        try:
+            self.at.run(timeout=self.timeout)
+            failed = bool(self.at.exception)
+        except Exception:
+            # Timeouts and crashes count as failed reruns
+            failed = True
+        samples.setdefault(action, []).append(time.perf_counter() - start)
+        if failed:
+            errors[action] = errors.get(action, 0) + 1
+
+    def do(self, action, samples, errors):
+        """
+        Performs one user action followed by the rerun(s) it triggers.
+        """
+        sidebar = self.at.sidebar
+        if action == "add":
+            self.added += 1
+            _widget(sidebar.text_input, "Description").set_value(f"load test {self.added}")
+            _widget(sidebar.number_input, "Amount").set_value(round(self.rng.uniform(5, 300), 2))
+            _widget(sidebar.button, "Add Expense").click()
+        elif action == "filter":
+            period = _widget(sidebar.selectbox, "Select Period")
+            period.set_value(self.rng.choice(period.options))
+        elif action == "analyze":
+            _widget(sidebar.button, "📊 Run Analysis").click()
+        elif action == "delete":
+            # Show every expense so there is something to delete
+            period = _widget(sidebar.selectbox, "Select Period")
+            if period.value != "All History":
+                period.set_value("All History")
+                self.run("filter", samples, errors)
+            delete_button = _widget(self.at.button, "Delete")
+            if delete_button is None or not self.at.dataframe:
+                action = "view"  # Nothing left to delete
+            else:
+                # Delete the first listed expense by the ID shown in the table
+                expense_id = int(self.at.dataframe[0].value["ID"].iloc[0])
+                _widget(self.at.number_input, "Enter expense ID to delete").set_value(expense_id)
+                delete_button.click()
+        self.run(action, samples, errors)
+
+
+def run_session(user_id, iterations, timeout, rng):
+    """
+    Runs one session's whole action loop. Returns its (samples, errors).
+    """
+    samples = {}
+    errors = {}
+    actions = list(ACTION_WEIGHTS)
+    weights = list(ACTION_WEIGHTS.values())
+
+    try:
+        session = SimulatedSession(user_id, timeout, rng)
+    except Exception:
+        errors["harness"] = 1
+        return samples, errors
+    session.run("first_load", samples, errors)
+
+    for _ in range(iterations):
+        try:
+            session.do(rng.choices(actions, weights)[0], samples, errors)
+        except Exception:
+            # A widget missing after a failed rerun - count it and move on
+            errors["harness"] = errors.get("harness", 0) + 1
+    return samples, errors
+
+
+def provision_users(user_ids, snapshot_dir):
+    """
+    Creates the load test users the same way the CLI does (the dashboard only opens existing users).
+    """
+    # Throwaway snapshots, so the measured sessions still start cold
+    os.environ["SNAPSHOT_DIR"] = snapshot_dir
+    from classes import ExpenseManager
+
+    for user_id in sorted(set(user_ids)):
+        ExpenseManager(user_id)
+
+
+def run_worker(worker_id, user_ids, iterations, timeout, seed, snapshot_dir):
+    """
+    Runs a group of sessions in one process, each in its own thread so they rerun concurrently.
+    Returns latency samples, error counts, connection count and memory usage.
+    """
+    # Each run starts cold instead of reusing snapshots left by earlier runs
+    os.environ["SNAPSHOT_DIR"] = snapshot_dir
+
+    import psycopg2
+
+    # Count every connection the app opens from this process
+    connect_count = [0]
+    count_lock = threading.Lock()
+    original_connect = psycopg2.connect
+
+    def counting_connect(*args, **kwargs):
+        with count_lock:
+            connect_count[0] += 1
+        return original_connect(*args, **kwargs)
+
+    psycopg2.connect = counting_connect
+
+    # Each session gets its own RNG and result dicts, so threads share nothing
+    results = [None] * len(user_ids)
+
+    def session_thread(i, user_id):
+        rng = random.Random(f"{seed}-{user_id}")
+        results[i] = run_session(user_id, iterations, timeout, rng)
+
+    threads = [threading.Thread(target=session_thread, args=(i, user_id))
+               for i, user_id in enumerate(user_ids)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = {}
+    errors = {}
+    for session_samples, session_errors in results:
+        for action, values in session_samples.items():
+            samples.setdefault(action, []).extend(values)
+        for action, count in session_errors.items():
+            errors[action] = errors.get(action, 0) + count
+
+    # ru_maxrss is in KB on Linux but in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+    return {
+        "worker": worker_id,
+        "samples": samples,
+        "errors": errors,
+        "connections_opened": connect_count[0],
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+class ConnectionSampler:
+    """
+    Polls pg_stat_activity in a background thread to track open connections to the app database.
+    """
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.counts = []
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        import psycopg2
+        from classes import DB_HOST, DB_NAME, DB_USER, DB_PASS
+
+        conn = psycopg2.connect(host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASS)
+        conn.autocommit = True
+        cur = conn.cursor()
+        while not self._stop_event.wait(self.interval):
+            # Exclude the sampler's own connection
+            cur.execute("""
+                SELECT count(*) FROM pg_stat_activity
+                WHERE datname = %s AND pid <> pg_backend_pid();
+            """, (DB_NAME,))
+            self.counts.append(cur.fetchone()[0])
+        cur.close()
+        conn.close()
+
+
+def existing_users(user_ids):
+    """
+    Returns the given user IDs that already have a partition or budget row in the database.
+    """
+    import psycopg2
+    from classes import DB_HOST, DB_NAME, DB_USER, DB_PASS, partition_name
+
+    conn = psycopg2.connect(host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASS)
+    cur = conn.cursor()
+    found = set()
+    for user_id in sorted(set(user_ids)):
+        cur.execute("SELECT to_regclass(%s)", (partition_name(user_id),))
+        if cur.fetchone()[0]:
+            found.add(user_id)
+    cur.execute("SELECT to_regclass('budget') IS NOT NULL")
+    if cur.fetchone()[0]:
+        cur.execute("SELECT user_id FROM budget WHERE user_id = ANY(%s)", (sorted(set(user_ids)),))
+        found.update(row[0] for row in cur.fetchall())
+    cur.close()
+    conn.close()
+    return sorted(found)
+
+
+def cleanup(user_ids):
+    """
+    Removes everything the load test created: the loadtest users' partitions
+    (and so their expenses), recurring rules and budget rows.
+    """
+    import psycopg2
+    from psycopg2 import sql
+    from classes import DB_HOST, DB_NAME, DB_USER, DB_PASS, partition_name
+
+    user_ids = sorted(set(user_ids))
+    conn = psycopg2.connect(host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASS)
+    cur = conn.cursor()
+    for user_id in user_ids:
+        cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(partition_name(user_id))))
+    cur.execute("DELETE FROM recurring_expenses WHERE user_id = ANY(%s)", (user_ids,))
+    cur.execute("DELETE FROM budget WHERE user_id = ANY(%s)", (user_ids,))
+    conn.commit()
+    cur.close()
+    conn.close()
+    print(f"Cleaned up {len(user_ids)} load test user(s).")
+
+
+def print_report(results, sampler, elapsed, sessions, workers):
+    """
+    Prints latency percentiles per action, error counts, DB connections and memory.
+    """
+    by_action = {}
+    errors = {}
+    for result in results:
+        for action, values in result["samples"].items():
+            by_action.setdefault(action, []).extend(values)
+        for action, count in result["errors"].items():
+            errors[action] = errors.get(action, 0) + count
+
+    all_samples = sorted(v for values in by_action.values() for v in values)
+    total_reruns = len(all_samples)
+
+    print(f"\n--- Rerun Latency (ms) - {sessions} concurrent sessions "
+          f"({workers} process(es), one thread per session) ---")
+    print(f"{total_reruns} reruns in {elapsed:.1f}s ({total_reruns / elapsed:.1f}/s)")
+    print(f"{'action':<12}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}")
+    rows = sorted(by_action.items()) + [("ALL", all_samples)]
+    for action, values in rows:
+        values = sorted(values)
+        err = sum(errors.values()) if action == "ALL" else errors.get(action, 0)
+        print(f"{action:<12}{len(values):>8}"
+              f"{percentile(values, 50) * 1000:>10.1f}"
+              f"{percentile(values, 95) * 1000:>10.1f}"
+              f"{percentile(values, 99) * 1000:>10.1f}{err:>8}")
+    if errors.get("harness"):
+        print(f"Harness errors (widget not found): {errors['harness']}")
+
+    print("\n--- Database Connections ---")
+    opened = sum(r["connections_opened"] for r in results)
+    print(f"Opened by app:     {opened} ({opened / max(total_reruns, 1):.1f} per rerun)")
+    if sampler.counts:
+        print(f"Concurrently open: max {max(sampler.counts)}, "
+              f"avg {sum(sampler.counts) / len(sampler.counts):.1f}")
+
+    print("\n--- Memory (peak RSS per worker process) ---")
+    for result in sorted(results, key=lambda r: r["worker"]):
+        print(f"Worker {result['worker']}: {result['peak_rss_mb']:.1f} MB")
+    print("-" * 20 + "\n")
+
+
+def main():
+    """Parses arguments, runs the workers and prints the report."""
+    parser = argparse.ArgumentParser(description="Load test the Streamlit dashboard.")
+    parser.add_argument("--sessions", type=int, default=10, help="Number of simulated sessions")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes to spread sessions over")
+    parser.add_argument("--iterations", type=int, default=20, help="Actions per session")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Max seconds per rerun")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the action mix")
+    parser.add_argument("--shared-user", action="store_true",
+                        help="All sessions use one user instead of one user per session")
+    parser.add_argument("--json", help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    # Run from the project folder so AppTest finds app.py and .env
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # Unique per run, so cleanup can never touch a real user's data
+    prefix = f"loadtest-{uuid.uuid4().hex[:12]}"
+    user_ids = [prefix if args.shared_user else f"{prefix}-{i}" for i in range(args.sessions)]
+    clashes = existing_users(user_ids)
+    if clashes:
+        sys.exit(f"Refusing to run: users already exist in the database: {', '.join(clashes)}")
+    workers = max(1, min(args.workers, args.sessions))
+    groups = [user_ids[i::workers] for i in range(workers)]
+
+    sampler = ConnectionSampler()
+    try:
+        with tempfile.TemporaryDirectory() as provision_dir:
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                pool.apply(provision_users, (user_ids, provision_dir))
+
+        sampler.start()
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            with multiprocessing.get_context("spawn").Pool(workers) as pool:
+                results = pool.starmap(run_worker, [
+                    (i, group, args.iterations, args.timeout, args.seed, snapshot_dir)
+                    for i, group in enumerate(groups)
+                ])
+        elapsed = time.perf_counter() - start
+    finally:
+        if sampler.is_running():
+            sampler.stop()
+        cleanup(user_ids)
+
+    print_report(results, sampler, elapsed, args.sessions, workers)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "elapsed": elapsed, "results": results,
+                       "db_connections": sampler.counts}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+# Every amount in the app is kept as whole cents (int) plus a currency code.
+# Integer cents keep sums exact - no float rounding drift in reports.
+
+DEFAULT_CURRENCY = "NIS"
+MAX_CENTS = 2**63 - 1  # Amounts must fit a signed 64-bit integer of cents
+
+
+class Money:
+    """
+    Represents an exact money amount stored as integer cents with a currency.
+    """
+    __slots__ = ("cents", "currency")
+
+    def __init__(self, cents=0, currency=DEFAULT_CURRENCY):
+        self.cents = int(cents)
+        self.currency = currency
+
+    @classmethod
+    def from_value(cls, value, currency=DEFAULT_CURRENCY):
+        """
+        Builds a Money from a string, int, float or Decimal (e.g. "12.50", 12.5, Decimal("12.5")).
+        Rounds half-up to the nearest cent. Raises ValueError for non-numeric input
+        or amounts outside the int64 cents range.
+        """
+        if isinstance(value, Money):
+            return value
+        try:
+            # Go through str() so floats like 0.1 become "0.1" and not 0.1000000000000000055...
+            dec = Decimal(str(value).strip())
+            if not dec.is_finite():
+                raise ValueError(f"Invalid money amount: {value!r}")
+            cents = int(dec.scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except ArithmeticError:
+            # InvalidOperation (bad syntax, or too many digits to quantize) is an ArithmeticError
+            raise ValueError(f"Invalid money amount: {value!r}")
+        if abs(cents) > MAX_CENTS:
+            raise ValueError(f"Money amount out of range: {value!r}")
+        return cls(cents, currency)
+
+    def to_decimal(self):
+        """
+        Returns the amount as an exact Decimal (used for NUMERIC database columns).
+        """
+        return Decimal(self.cents).scaleb(-2)
+
+    def __float__(self):
+        # Only for display / charting - never for arithmetic
+        return self.cents / 100
+
+    def _check_currency(self, other):
+        if self.currency != other.currency:
+            raise ValueError(f"Currency mismatch: {self.currency} vs {other.currency}")
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            self._check_currency(other)
+            return Money(self.cents + other.cents, self.currency)
+        if other == 0:
+            return self
+        return NotImplemented
+
+    # Allows sum(list_of_money) which starts from int 0
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            self._check_currency(other)
+            return Money(self.cents - other.cents, self.currency)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.cents, self.currency)
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents and self.currency == other.currency
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            self._check_currency(other)
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, Money):
+            self._check_currency(other)
+            return self.cents <= other.cents
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, Money):
+            self._check_currency(other)
+            return self.cents > other.cents
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, Money):
+            self._check_currency(other)
+            return self.cents >= other.cents
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.cents, self.currency))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __str__(self):
+        sign = "-" if self.cents < 0 else ""
+        whole, frac = divmod(abs(self.cents), 100)
+        return f"{sign}{whole}.{frac:02d}"
+
+    def __repr__(self):
+        return f"Money({str(self)!r} {self.currency})"
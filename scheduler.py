@@ -0,0 +1,39 @@
+import threading
+
+
+class RecurringScheduler:
+    """
+    Periodically materializes due recurring expenses for an ExpenseManager in a background thread.
+    ExpenseManager already materializes on startup; this covers long-running processes
+    that stay open across a billing date.
+    """
+    def __init__(self, manager, interval_seconds=3600):
+        self.manager = manager
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the background thread (no-op if already running).
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Signals the background thread to exit.
+        """
+        self._stop_event.set()
+
+    def _run(self):
+        # wait() returns True once stop() is called
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.manager.materialize_recurring()
+            except Exception as e:
+                # Keep the scheduler alive if the DB is temporarily unreachable
+                print(f"Recurring expenses update failed: {e}")
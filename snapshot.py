@@ -0,0 +1,136 @@
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from datetime import date, datetime
+
+# On-disk snapshot of one user's in-memory expense list, stored column by column:
+#
+#   MAGIC | header length (uint32) | JSON header | id int64[n] | cents int64[n]
+#   | date ordinal int32[n] | name end offsets uint32[n] | category index uint16[n] | name bytes (utf-8)
+#
+# The header is padded so every column starts 8-byte aligned; columns are read back
+# straight from a memory map, so loading does not parse text per row.
+
+MAGIC = b"EXPSNAP1"
+COLUMNS = [("id", "q"), ("cents", "q"), ("date", "i"), ("name_end", "I"), ("category", "H")]
+
+
+def _date_ordinal(value):
+    """
+    Converts an expense date (DD/MM/YYYY string or date object) to a day number. 0 = unknown.
+    """
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return datetime.strptime(value, "%d/%m/%Y").toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def save_snapshot(path, expenses, watermark, budget_cents=0, currency="NIS"):
+    """
+    Writes the expenses and sync watermark to path. The file is replaced atomically,
+    so readers never see a half-written snapshot.
+    """
+    categories = []
+    category_index = {}
+    cols = {name: array(code) for name, code in COLUMNS}
+    names = bytearray()
+
+    for exp in expenses:
+        if exp.category not in category_index:
+            category_index[exp.category] = len(categories)
+            categories.append(exp.category)
+        names += (exp.name or "").encode("utf-8")
+        cols["id"].append(exp.id or 0)
+        cols["date"].append(_date_ordinal(exp.date))
+        cols["cents"].append(exp.amount.cents)
+        cols["category"].append(category_index[exp.category])
+        cols["name_end"].append(len(names))
+
+    header = json.dumps({
+        "count": len(expenses),
+        "byteorder": sys.byteorder,
+        "watermark": watermark,
+        "budget_cents": budget_cents,
+        "currency": currency,
+        "categories": categories,
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # Unique temp file per write: several managers may save the same user's snapshot at once
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            for name, _ in COLUMNS:
+                cols[name].tofile(f)
+            f.write(names)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path):
+    """
+    Reads a snapshot written by save_snapshot.
+    Returns (header dict, columns dict) or None if the file is missing, truncated or corrupt.
+    Columns: id, date (ordinal), cents, category (str), name (str) - one list each.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                return None
+            pos = len(MAGIC)
+            header_len = int.from_bytes(mm[pos:pos + 4], "little")
+            pos += 4
+            header = json.loads(mm[pos:pos + header_len].decode("utf-8"))
+            pos += header_len
+            if header["byteorder"] != sys.byteorder:
+                return None
+
+            count = header["count"]
+            if not isinstance(count, int) or count < 0:
+                return None
+            columns_size = sum(array(code).itemsize for _, code in COLUMNS) * count
+            if len(mm) < pos + columns_size:
+                return None
+            cols = {}
+            view = memoryview(mm)
+            try:
+                for name, code in COLUMNS:
+                    size = array(code).itemsize * count
+                    with view[pos:pos + size] as column:
+                        cols[name] = column.cast(code).tolist()
+                    pos += size
+                names = bytes(view[pos:])
+            finally:
+                view.release()
+
+            categories = header["categories"]
+            if any(i >= len(categories) for i in cols["category"]):
+                return None
+            cols["category"] = [categories[i] for i in cols["category"]]
+            # Name offsets must be increasing and end exactly at the end of the file
+            name_ends = cols["name_end"]
+            if any(a > b for a, b in zip(name_ends, name_ends[1:])) or \
+                    (name_ends[-1] if name_ends else 0) != len(names):
+                return None
+            start = 0
+            cols["name"] = []
+            for end in cols.pop("name_end"):
+                cols["name"].append(names[start:end].decode("utf-8"))
+                start = end
+            return header, cols
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
@@ -58,5 +58,46 @@ def filter_expenses_by_period(expenses, selected_period):
             pass
         
     return filtered_expenses, target_month
-                
 
+
+def sum_by_category(expenses):
+    """
+    Sums expense amounts per category using integer cents.
+    Returns a tuple of (total_cents, {category: cents}).
+    """
+    total_cents = 0
+    category_totals = {}
+
+    for exp in expenses:
+        cents = exp.amount.cents
+        total_cents += cents
+        category_totals[exp.category] = category_totals.get(exp.category, 0) + cents
+
+    return total_cents, category_totals
+
+def get_monthly_totals(expenses, before=None):
+    """
+    Sums expense amounts (cents) per month, optionally only for expenses dated before a given date.
+    Returns a dict of {(year, month): cents}.
+    """
+    totals = {}
+
+    for exp in expenses:
+        if not exp.date:
+            continue
+        try:
+            if isinstance(exp.date, str):
+                exp_day = datetime.strptime(exp.date, "%d/%m/%Y").date()
+            elif isinstance(exp.date, datetime):
+                exp_day = exp.date.date()
+            else:
+                exp_day = exp.date
+        except ValueError:
+            continue
+
+        if before and exp_day >= before:
+            continue
+        key = (exp_day.year, exp_day.month)
+        totals[key] = totals.get(key, 0) + exp.amount.cents
+
+    return totals
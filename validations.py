@@ -1,10 +1,14 @@
 from datetime import datetime
+from money import Money
 
 # Constant list of allowed categories. 
 # Using a predefined list prevents typos (e.g., "Food" vs "food").
 
 CATEGORIES = ["Food", "Transport", "Bills", "Shopping", "Entertainment", "Other"]
 
+# Supported repeat schedules for recurring expenses ("custom" = every N days)
+RECURRING_FREQUENCIES = ["monthly", "weekly", "custom"]
+
 def get_valid_category():
     """
     Displays the list of categories and prompts the user to select one by index.
@@ -32,15 +36,15 @@ def get_valid_amount():
     """
     Prompts the user for an amount and validates that it is a positive number.
     Returns:
-        str: The valid amount as a string (to be stored in CSV).
+        Money: The valid amount as exact integer cents.
     """
     while True:
         amount_str = input("Amount: ")
-        #Try converting the string to a float
+        #Try converting the string to an exact Money amount
         try:
-            amount = float(amount_str) 
-            if amount > 0:
-                return amount_str #Return as a string
+            amount = Money.from_value(amount_str) 
+            if amount.cents > 0:
+                return amount
             else: 
                 print("Amount must be positive.")
 
@@ -62,3 +66,29 @@ def get_valid_date():
             return date_str
         except ValueError:
             print("Invalid format. Please use DD/MM/YYYY (e.g., 01/01/2026)")
+
+def get_valid_frequency():
+    """
+    Prompts the user to select a recurring frequency and, for "custom", the interval in days.
+    Returns:
+        tuple: (frequency, interval_days) - interval_days is None unless frequency is "custom".
+    """
+    print("\n--- Select Frequency ---")
+    for i, freq in enumerate(RECURRING_FREQUENCIES, start=1):
+        print(f"{i}. {freq}")
+
+    while True:
+        choice = input("Enter frequency number: ")
+        if choice.isdigit() and 0 <= int(choice) - 1 < len(RECURRING_FREQUENCIES):
+            frequency = RECURRING_FREQUENCIES[int(choice) - 1]
+            break
+        print("Invalid choice. Please choose a number from the list.")
+
+    if frequency != "custom":
+        return frequency, None
+
+    while True:
+        days_str = input("Repeat every how many days: ")
+        if days_str.isdigit() and int(days_str) > 0:
+            return frequency, int(days_str)
+        print("Please enter a positive whole number.")